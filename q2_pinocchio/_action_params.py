@@ -257,7 +257,7 @@ find_consensus_annotation_params = {
     "min_consensus": Float % Range(0.5, 1.0, inclusive_end=True, inclusive_start=False),
     "unassignable_label": Str,
 }
-find_consensus_annotation_params_dsc = {
+find_consensus_annotation_param_dsc = {
     "min_consensus": "Minimum fraction of assignments must match top "
     "hit to be accepted as consensus assignment.",
     "unassignable_label": "Annotation given when no consensus is found.",
@@ -281,13 +281,13 @@ find_consensus_annotation_dsc = (
 # stats
 T = TypeMatch([SequencesWithQuality, PairedEndSequencesWithQuality])
 stats_inputs = {"sequences": SampleData[T]}
-stats_input_descriptions = {"sequences": "Sequences to be analyzed."}
+stats_inputs_dsc = {"sequences": "Sequences to be analyzed."}
 stats_dsc = "Quality control statistics of long-read sequencing data using NanoPlot."
 
 # trim
 trim_inputs = {"query": SampleData[T]}
 trim_outputs = [("filtered_query", SampleData[T])]
-trim_parameters = {
+trim_params = {
     "n_threads": Int % Range(1, None),
     "min_quality": Int % Range(0, None),
     "max_quality": Int % Range(0, None),
@@ -296,9 +296,9 @@ trim_parameters = {
     "headcrop": Int % Range(0, None),
     "tailcrop": Int % Range(0, None),
 }
-trim_input_descriptions = {"query": "Sequences to be trimmed."}
-trim_output_descriptions = {"filtered_query": "Trimmed sequences."}
-trim_parameter_descriptions = {
+trim_inputs_dsc = {"query": "Sequences to be trimmed."}
+trim_outputs_dsc = {"filtered_query": "Trimmed sequences."}
+trim_param_dsc = {
     "n_threads": "Number of threads.",
     "min_quality": "Sets a minimum Phred average quality score.",
     "max_quality": "Sets a maximum Phred average quality score.",
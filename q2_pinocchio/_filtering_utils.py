@@ -11,7 +11,7 @@ import shutil
 import subprocess
 import tempfile
 
-from q2_pinocchio._utils import run_command
+from q2_pinocchio._utils import EXTERNAL_CMD_WARNING, run_command
 
 
 # Set Minimap2 alignment penalties based on provided parameters
@@ -31,14 +31,41 @@ def set_penalties(
     return options
 
 
+# Validate that exactly one of index or reference was provided and return
+# the path Minimap2 should align against
+def resolve_index_or_reference(index, reference):
+    if reference and index:
+        raise ValueError(
+            "Only one of reference or index can be provided as input. "
+            "Choose one and try again."
+        )
+
+    if not reference and not index:
+        raise ValueError("Either reference or index must be provided as input.")
+
+    if index:
+        return str(index.path / "index.mmi")
+
+    return str(reference.path)
+
+
+# Length of the "\tNM:i:" prefix that introduces the edit-distance tag
+_NM_TAG_LEN = 6
+
+
 # Function to calculate the identity percentage of an alignment
 def calculate_identity(aln, total_length):
-    try:
-        # Extracts the number of mismatches (NM tag) from the SAM file alignment line
-        nm = int([x for x in aln.split("\t") if x.startswith("NM:i:")][0].split(":")[2])
-    except IndexError:
-        # Defaults to 0 mismatches if the NM tag is not found
+    # Extracts the number of mismatches (NM tag) from the SAM file alignment
+    # line, defaulting to 0 mismatches if the NM tag is not found; a plain
+    # substring scan for the first occurrence is cheaper than a regex and
+    # int() tolerates the trailing newline of a tag in last position
+    start = aln.find("\tNM:i:")
+    if start == -1:
         nm = 0
+    else:
+        start += _NM_TAG_LEN
+        end = aln.find("\t", start)
+        nm = int(aln[start:] if end == -1 else aln[start:end])
 
     # Calculates matches by subtracting mismatches from total length
     matches = total_length - nm
@@ -49,20 +76,62 @@ def calculate_identity(aln, total_length):
     return identity_percentage
 
 
+# Matches the match, insertion and deletion operations of a CIGAR
+# string; compiled once at import instead of per call
+_CIGAR_RE = re.compile(r"(\d+)([MID])")
+
+
 # Function to get the alignment length from a CIGAR string
 def get_alignment_length(cigar):
     if cigar == "*":
         # Returns 0 if the CIGAR string is '*', indicating no alignment
         return 0
 
-    # Extracts all match, insertion, and deletion operations from the CIGAR string
-    matches = re.findall(r"(\d+)([MID])", cigar)
-
     # Sums the lengths of matches, insertions, and deletions to get total
-    # alignment length
-    total_length = sum(int(length) for length, op in matches if op in ["M", "D", "I"])
-
-    return total_length
+    # alignment length; the pattern already restricts the ops, so no
+    # per-token membership test is needed
+    return sum(int(length) for length, _ in _CIGAR_RE.findall(cigar))
+
+
+# FLAG bits excluding a record from "mapped" output: unmapped (0x4) or
+# secondary alignment (0x100)
+_NOT_PRIMARY_MAPPED = 0x4 | 0x100
+
+
+# Filter SAM records streaming from infile to outfile, based on mappings
+# and identity percentage
+def filter_sam_stream(infile, outfile, keep, min_per_identity):
+    for line in infile:
+        # Writes header lines directly to the output file
+        if line.startswith("@"):
+            outfile.write(line)
+            continue
+
+        # Extract information from the line; only the FLAG and CIGAR
+        # columns and the tag tail are needed, so a bounded split avoids
+        # allocating a string per field
+        parts = line.split("\t", 6)
+        flag = int(parts[1])
+
+        # The cheap FLAG checks come first; the CIGAR/NM parsing needed
+        # for the identity percentage only runs for records whose fate
+        # actually depends on it
+        if keep == "mapped":
+            if flag & _NOT_PRIMARY_MAPPED:
+                continue
+            if min_per_identity and parts[5] != "*":
+                total_length = get_alignment_length(parts[5])
+                if calculate_identity(parts[-1], total_length) < min_per_identity:
+                    continue
+            outfile.write(line)
+        else:
+            # Keep unmapped reads, or mapped reads below the identity threshold
+            if flag & 0x4:
+                outfile.write(line)
+            elif min_per_identity and parts[5] != "*":
+                total_length = get_alignment_length(parts[5])
+                if calculate_identity(parts[-1], total_length) < min_per_identity:
+                    outfile.write(line)
 
 
 # Function to process a SAM file, filter based on mappings and identity percentage
@@ -71,45 +140,80 @@ def process_sam_file(input_sam_file, keep, min_per_identity):
     with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp_file, open(
         input_sam_file, "r"
     ) as infile:
-
-        for line in infile:
-            # Writes header lines directly to the output file
-            if line.startswith("@"):
-                tmp_file.write(line)
-                continue
-
-            # Extract information from the line
-            parts = line.split("\t")
-            flag = int(parts[1])
-            cigar = parts[5]
-
-            # Calculates identity percentage for alignments with a valid CIGAR string
-            if min_per_identity and cigar != "*":
-                total_length = get_alignment_length(cigar)
-                identity_percentage = calculate_identity(line, total_length)
-            else:
-                # Defaults identity percentage to 100% if no CIGAR string or no
-                # min_per_identity specified
-                identity_percentage = 1
-
-            # Logic for including or excluding reads based on mappings and
-            # identity percentage
-            if keep == "mapped":
-                if not (flag & 0x4) and not (flag & 0x100):
-                    if not min_per_identity or identity_percentage >= min_per_identity:
-                        tmp_file.write(line)
-            else:
-                # Condition for keeping unmapped reads or mapped reads below the
-                # identity threshold
-                if (flag & 0x4) or (
-                    min_per_identity and identity_percentage < min_per_identity
-                ):
-                    tmp_file.write(line)
+        filter_sam_stream(infile, tmp_file, keep, min_per_identity)
 
     # Replaces the original SAM file with the filtered temporary file
     shutil.move(tmp_file.name, input_sam_file)
 
 
+# Run Minimap2 with its SAM output piped through the read filter, so only
+# the surviving records are ever written to sam_fp
+def run_minimap2_filtered(mn2_cmd, sam_fp, keep, min_per_identity):
+    print(EXTERNAL_CMD_WARNING)
+    print("\nCommand:", end=" ")
+    print(" ".join(mn2_cmd), end="\n\n")
+
+    proc = subprocess.Popen(mn2_cmd, stdout=subprocess.PIPE, text=True)
+    with open(sam_fp, "w") as outfile:
+        filter_sam_stream(proc.stdout, outfile, keep, min_per_identity)
+    proc.stdout.close()
+
+    if proc.wait() != 0:
+        raise Exception(
+            "An error was encountered while using Minimap2, "
+            f"(return code {proc.returncode}), please inspect "
+            "stdout and stderr to learn more."
+        )
+
+
+# Run Minimap2 and stream its filtered SAM records straight into the
+# stdin of a consumer command (e.g. samtools fastq), so the SAM never
+# touches the filesystem at all
+def run_minimap2_filtered_piped(
+    mn2_cmd, consumer_cmd, consumer_name, keep, min_per_identity
+):
+    print(EXTERNAL_CMD_WARNING)
+    print("\nCommand:", end=" ")
+    print(f'{" ".join(mn2_cmd)} | {" ".join(consumer_cmd)}', end="\n\n")
+
+    mn2_proc = subprocess.Popen(mn2_cmd, stdout=subprocess.PIPE, text=True)
+    consumer_proc = subprocess.Popen(consumer_cmd, stdin=subprocess.PIPE, text=True)
+
+    # A consumer that exits early breaks the pipe mid-stream; note it and
+    # fall through to the return-code checks so the failure is reported
+    # in the usual form instead of as a raw BrokenPipeError
+    broken_pipe = False
+    try:
+        filter_sam_stream(mn2_proc.stdout, consumer_proc.stdin, keep, min_per_identity)
+    except BrokenPipeError:
+        broken_pipe = True
+    finally:
+        mn2_proc.stdout.close()
+        try:
+            consumer_proc.stdin.close()
+        except BrokenPipeError:
+            broken_pipe = True
+
+    mn2_rc = mn2_proc.wait()
+    consumer_rc = consumer_proc.wait()
+
+    # A broken pipe can also take Minimap2 down with SIGPIPE, so in that
+    # case the consumer's failure is the one worth reporting
+    if consumer_rc != 0 and (broken_pipe or mn2_rc == 0):
+        raise Exception(
+            f"An error was encountered while using {consumer_name}, "
+            f"(return code {consumer_rc}), please inspect "
+            "stdout and stderr to learn more."
+        )
+
+    if mn2_rc != 0:
+        raise Exception(
+            "An error was encountered while using Minimap2, "
+            f"(return code {mn2_rc}), please inspect "
+            "stdout and stderr to learn more."
+        )
+
+
 # Generate samtools fasta convert command
 def convert_to_fasta(_reads, n_threads, samfile_filepath):
     # -s /dev/null excludes singletons
@@ -148,23 +252,31 @@ def convert_to_fastq(_reads, n_threads, samfile_filepath, kind):
 
 
 # Generate Minimap2 mapping command
-def make_mn2_cmd(mapping_preset, index, n_threads, penalties, reads1, reads2, samf_fp):
-    # align to reference with Minimap2
-    minimap2_cmd = (
-        [
-            "minimap2",
-            "-a",
-            "-x",
-            mapping_preset,
-            str(index),
-            "-t",
-            str(n_threads),
-            "-o",
-            str(samf_fp),
-        ]
-        + penalties
-        + [reads1]
-    )
+def make_mn2_cmd(
+    mapping_preset, index, n_threads, penalties, reads1, reads2, samf_fp, mode=None
+):
+    # align to reference with Minimap2; without samf_fp the SAM output
+    # goes to stdout so it can be piped into a filter
+    minimap2_cmd = [
+        "minimap2",
+        "-a",
+        "-x",
+        mapping_preset,
+        str(index),
+        "-t",
+        str(n_threads),
+    ]
+
+    # When only mapped reads are kept downstream, let Minimap2 drop the
+    # unmapped records itself instead of emitting them just to be
+    # filtered out (supported since Minimap2 2.17)
+    if mode == "mapped":
+        minimap2_cmd.insert(2, "--sam-hit-only")
+
+    if samf_fp:
+        minimap2_cmd += ["-o", str(samf_fp)]
+
+    minimap2_cmd += penalties + [reads1]
 
     if reads2:
         minimap2_cmd.append(reads2)
@@ -190,7 +302,33 @@ def build_filtered_out_dir(input_reads, filtered_seqs):
         shutil.copy(os.path.join(filtered_seqs.path, filename), input_reads.path)
 
 
+# Check whether the records of a SAM file are already grouped in
+# adjacent pairs sharing a QNAME, in which case collation is redundant
+def _sam_pairs_already_adjacent(input_sam_path):
+    with open(input_sam_path, "r") as infile:
+        prev_qname = None
+        count = 0
+        for line in infile:
+            if line.startswith("@"):
+                continue
+            qname = line.split("\t", 1)[0]
+            if count & 1 and qname != prev_qname:
+                return False
+            prev_qname = qname
+            count += 1
+
+    # An odd record count means a pair is incomplete, so let samtools
+    # collate sort it out
+    return count % 2 == 0
+
+
 def collate_sam_inplace(input_sam_path):
+    # Minimap2 usually emits paired alignments adjacently already; a
+    # cheap linear scan of the QNAMEs then saves a full read/write cycle
+    # of the SAM through samtools
+    if _sam_pairs_already_adjacent(input_sam_path):
+        return
+
     # Temporary file prefix based on the input file name
     temp_prefix = os.path.splitext(input_sam_path)[0] + "_temp_collate"
     # Output file path in the same directory
@@ -226,20 +364,26 @@ def process_paired_sam_flags(input_sam_path):
                     temp_file.write(line)
                     continue
 
-                read1 = line.strip().split("\t")
-                read2 = infile.readline().strip().split("\t")
+                # Only the FLAG field (column 2) changes, so split each
+                # line just twice and keep the rest of the record intact
+                # instead of splitting and rejoining all of its fields
+                qname1, flag1, rest1 = line.split("\t", 2)
+                qname2, flag2, rest2 = infile.readline().split("\t", 2)
 
-                if int(read1[1]) == 4 and int(read2[1]) == 4:  # Both reads are unmapped
-                    read1[1] = "69"  # 1 + 4 + 64: Read is first in pair and unmapped
-                    read2[1] = "133"  # 1 + 4 + 128: Read is second in pair and unmapped
+                if int(flag1) == 4 and int(flag2) == 4:  # Both reads are unmapped
+                    flag1 = "69"  # 1 + 4 + 64: Read is first in pair and unmapped
+                    flag2 = "133"  # 1 + 4 + 128: Read is second in pair and unmapped
                 else:
                     # Ensure paired flags
                     # Add 1 and 64 (first read in a pair)
-                    read1[1] = str(int(read1[1]) | 1 | 64)
-                    # Add 1 and 128 (first read in a pair)
-                    read2[1] = str(int(read2[1]) | 1 | 128)
+                    flag1 = str(int(flag1) | 1 | 64)
+                    # Add 1 and 128 (second read in a pair)
+                    flag2 = str(int(flag2) | 1 | 128)
+
+                if not rest2.endswith("\n"):
+                    rest2 += "\n"
 
-                temp_file.write("\t".join(read1) + "\n")
-                temp_file.write("\t".join(read2) + "\n")
+                temp_file.write(f"{qname1}\t{flag1}\t{rest1}")
+                temp_file.write(f"{qname2}\t{flag2}\t{rest2}")
 
     shutil.move(temp_file.name, input_sam_path)
@@ -6,24 +6,23 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
-import tempfile
-
 from q2_types.feature_data import DNAFASTAFormat
 
 from q2_pinocchio._filtering_utils import (
     convert_to_fasta,
     make_mn2_cmd,
-    process_sam_file,
-    run_cmd,
+    resolve_index_or_reference,
+    run_minimap2_filtered_piped,
     set_penalties,
 )
 from q2_pinocchio.types._format import Minimap2IndexDBDirFmt
 
 
 # This function uses Minimap2 to align reads to a reference, filters the
-# resulting SAM file based on mapping criteria using samtools view, and
-# finally converts the filtered SAM file to FASTA format using samtools fasta,
-# saving the output in the specified directory.
+# alignments based on mapping criteria as they stream out of Minimap2, and
+# pipes the surviving records straight into samtools fasta, saving the
+# output in the specified directory. The intermediate SAM never touches
+# the filesystem.
 def _minimap2_extract_seqs(
     reads,
     outdir,
@@ -35,19 +34,19 @@ def _minimap2_extract_seqs(
     penalties,
 ):
 
-    with tempfile.NamedTemporaryFile() as sam_f:
-        # Use Minimap2 to find mapped and unmapped reads
-        mn2_cmd = make_mn2_cmd(
-            preset, idx_path, n_threads, penalties, reads, None, sam_f.name
-        )
-        run_cmd(mn2_cmd, "Minimap2")
+    # Use Minimap2 to find mapped and unmapped reads, writing SAM to
+    # stdout; in mapped mode Minimap2 drops unmapped records itself via
+    # --sam-hit-only
+    mn2_cmd = make_mn2_cmd(
+        preset, idx_path, n_threads, penalties, reads, None, None, mode=keep
+    )
 
-        # Filter sam file using samtools view
-        process_sam_file(sam_f.name, keep, min_per_identity)
+    # Convert to FASTA with samtools, reading the filtered SAM from stdin
+    convert_to_fasta_cmd = convert_to_fasta(outdir.path, n_threads, "-")
 
-        # Convert to FASTA with samtools
-        convert_to_fasta_cmd = convert_to_fasta(outdir.path, n_threads, sam_f.name)
-        run_cmd(convert_to_fasta_cmd, "samtools fasta")
+    run_minimap2_filtered_piped(
+        mn2_cmd, convert_to_fasta_cmd, "samtools fasta", keep, min_per_identity
+    )
 
 
 def extract_reads(
@@ -64,25 +63,12 @@ def extract_reads(
     gap_extension_penalty: int = None,
 ) -> DNAFASTAFormat:
 
-    if reference and index:
-        raise ValueError(
-            "Only one reference_reads or index_database artifact "
-            "can be provided as input. Choose one and try again."
-        )
+    # Validate the inputs and determine the reference or index path
+    idx_ref_path = resolve_index_or_reference(index, reference)
 
     # Initialize directory format for filtered sequences
     filtered_seqs = DNAFASTAFormat()
 
-    # Get the path of index database or reference
-    if index:
-        idx_ref_path = str(index.path) + "/index.mmi"
-    elif reference:
-        idx_ref_path = str(reference.path)
-    else:
-        raise ValueError(
-            "Either reference_reads or a minimap2_index must be provided as input."
-        )
-
     penalties = set_penalties(
         matching_score, mismatching_penalty, gap_open_penalty, gap_extension_penalty
     )
@@ -17,8 +17,10 @@ from q2_pinocchio._filtering_utils import (
     convert_to_fastq,
     make_mn2_cmd,
     process_paired_sam_flags,
-    process_sam_file,
+    resolve_index_or_reference,
     run_cmd,
+    run_minimap2_filtered,
+    run_minimap2_filtered_piped,
     set_penalties,
 )
 from q2_pinocchio.types._format import Minimap2IndexDBDirFmt
@@ -38,19 +40,20 @@ def _minimap2_filter_reads(
     min_per_identity,  # Minimum percentage identity for a read to be included
     penalties,  # Scoring penalties for Minimap2 alignment
 ):
-    # Create a temporary file for SAM output from Minimap2
-    with tempfile.NamedTemporaryFile() as sam_f:
-        # Construct and execute Minimap2 command for alignment
-        mn2_cmd = make_mn2_cmd(
-            preset, idx_path, n_threads, penalties, reads1, reads2, sam_f.name
-        )
-
-        run_cmd(mn2_cmd, "Minimap2")
+    # Construct the Minimap2 command with SAM output on stdout; in mapped
+    # mode Minimap2 drops unmapped records itself via --sam-hit-only
+    mn2_cmd = make_mn2_cmd(
+        preset, idx_path, n_threads, penalties, reads1, reads2, None, mode=keep
+    )
 
-        # Filter the SAM file using samtools based on the include/exclude criteria
-        process_sam_file(sam_f.name, keep, min_per_identity)
+    if reads2:
+        # Paired reads need a seekable SAM for collation, so the filtered
+        # records go through a temporary file
+        with tempfile.NamedTemporaryFile() as sam_f:
+            # Stream the Minimap2 output through the include/exclude filter,
+            # writing only the surviving records to the temporary SAM file
+            run_minimap2_filtered(mn2_cmd, sam_f.name, keep, min_per_identity)
 
-        if reads2:
             # Ensuring proper read grouping of paired reads
             collate_sam_inplace(sam_f.name)
             # Making flags suitable for samtools fastq command
@@ -64,15 +67,16 @@ def _minimap2_filter_reads(
             convert_to_fastq_cmd = convert_to_fastq(
                 _reads, n_threads, sam_f.name, "paired"
             )
-        else:
-            # Convert SAM to FASTQ
-            fwd = str(outdir.path / os.path.basename(reads1))
-            _reads = ["-0", fwd]
-            convert_to_fastq_cmd = convert_to_fastq(
-                _reads, n_threads, sam_f.name, "single"
-            )
-
-        run_cmd(convert_to_fastq_cmd, "samtools fastq")
+            run_cmd(convert_to_fastq_cmd, "samtools fastq")
+    else:
+        # Single-end reads need no collation, so the filtered records are
+        # piped straight into samtools fastq without an intermediate file
+        fwd = str(outdir.path / os.path.basename(reads1))
+        _reads = ["-0", fwd]
+        convert_to_fastq_cmd = convert_to_fastq(_reads, n_threads, "-", "single")
+        run_minimap2_filtered_piped(
+            mn2_cmd, convert_to_fastq_cmd, "samtools fastq", keep, min_per_identity
+        )
 
 
 def filter_reads(
@@ -89,22 +93,8 @@ def filter_reads(
     gap_extension_penalty: int = None,  # Penalty for extending a gap
 ) -> CasavaOneEightSingleLanePerSampleDirFmt:
 
-    # Ensure that only one of reference or index is provided
-    if reference and index:
-        raise ValueError(
-            "Only one of reference or index can be provided as input. "
-            "Choose one and try again."
-        )
-
-    # Ensure that at least one of reference and index is provided
-    if not reference and not index:
-        raise ValueError("Either reference or index must be provided as input.")
-
-    # Determine the reference path from the provided index or reference
-    if index:
-        idx_ref_path = str(index) + "/index.mmi"  # Path to index file
-    elif reference:
-        idx_ref_path = str(reference)  # Path to the reference file
+    # Validate the inputs and determine the reference or index path
+    idx_ref_path = resolve_index_or_reference(index, reference)
 
     # Initialize directory format for filtered sequences
     filtered_seqs = CasavaOneEightSingleLanePerSampleDirFmt()
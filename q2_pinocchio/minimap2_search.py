@@ -6,16 +6,25 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import subprocess
+
+import numpy as np
 import pandas as pd
 from q2_types.feature_data import DNAFASTAFormat
 
-from q2_pinocchio._filtering_utils import run_cmd
-from q2_pinocchio.types._format import Minimap2IndexDBDirFmt, PairwiseAlignmentMN2Format
+from q2_pinocchio._filtering_utils import resolve_index_or_reference
+from q2_pinocchio._utils import EXTERNAL_CMD_WARNING
+from q2_pinocchio.types._format import Minimap2IndexDBDirFmt
 
 
 # Filter a PAF file to keep only a certain number of entries
 # for each individual query name, as defined by "maxaccepts"
 def filter_by_maxaccepts(df, maxaccepts):
+    # No row can exceed the cap when it is unset or at least as large as
+    # the total number of alignments, so skip the groupby pass entirely
+    if maxaccepts is None or maxaccepts >= len(df):
+        return df
+
     # Group by query_name and count occurrences
     counts = df.groupby(0).cumcount() + 1
 
@@ -27,31 +36,49 @@ def filter_by_maxaccepts(df, maxaccepts):
 
 # Filter PAF entries based on a threshold of percentage identity
 def filter_by_perc_identity(df, perc_identity, output_no_hits):
-    # Filter mapped query entries based on identity score
-    mapped_df = df[df[9] / df[10] >= perc_identity]
+    # Compute the identity score once, on plain numpy arrays
+    num = df[9].to_numpy()
+    den = df[10].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        identity = num / den
 
-    if output_no_hits:
-        filtered_out = df[(df[9] / df[10] < perc_identity) | (df[10] == 0)]
+    mapped_mask = identity >= perc_identity
+
+    if not output_no_hits:
+        # Filter mapped query entries based on identity score
+        return df[mapped_mask]
+
+    filtered_out_idx = np.nonzero((identity < perc_identity) | (den == 0))[0]
+
+    # Keep only the first entry/row for each unique query
+    # that is filtered out, which signifies that we treat it
+    # as an unmapped query
+    _, first_idx = np.unique(df[1].to_numpy()[filtered_out_idx], return_index=True)
+    filtered_out_idx = filtered_out_idx[first_idx]
 
-        # Keep only the first entry/row for each unique query
-        # that is filtered out, which signifies that we treat it
-        # as an unmapped query
-        filtered_out = filtered_out.drop_duplicates(subset=1)
+    # Take the mapped and filtered-out rows in their original order with
+    # a single positional copy, so the full frame never coexists with
+    # two materialized partitions plus their concatenation
+    merged_idx = np.concatenate([np.nonzero(mapped_mask)[0], filtered_out_idx])
+    unmapped_rows = np.zeros(len(merged_idx), dtype=bool)
+    unmapped_rows[len(merged_idx) - len(filtered_out_idx) :] = True
 
-        # Change paf file column entries that are filtered out
-        # to indicate that are unmapped queries
-        filtered_out.iloc[:, 2:12] = 0
-        filtered_out.iloc[:, 4:6] = "*"
-        filtered_out.iloc[:, 12:] = "*"
+    order = np.argsort(merged_idx, kind="stable")
+    result = df.iloc[merged_idx[order]].copy()
+    unmapped_rows = unmapped_rows[order]
 
-        # Merging the two DataFrames based on row number
-        mapped_df = pd.concat([mapped_df, filtered_out], axis=0)
-        mapped_df = mapped_df.sort_index()
+    # Change paf file column entries that are filtered out
+    # to indicate that are unmapped queries
+    result.iloc[unmapped_rows, 2:12] = 0
+    result.iloc[unmapped_rows, 4:6] = "*"
+    result.iloc[unmapped_rows, 12:] = "*"
 
-    return mapped_df
+    return result
 
 
-# Construct the command list for the Minimap2 alignment search
+# Construct the command list for the Minimap2 alignment search.
+# All path arguments are expected as plain strings; callers coerce once.
+# Without paf_file_fp the PAF output goes to stdout.
 def construct_command(
     idx_ref_path, query_reads, n_threads, mapping_preset, paf_file_fp, output_no_hits
 ):
@@ -60,13 +87,13 @@ def construct_command(
         "-x",
         mapping_preset,
         "-c",
-        str(idx_ref_path),
-        str(query_reads),
+        idx_ref_path,
+        query_reads,
         "-t",
         str(n_threads),
-        "-o",
-        str(paf_file_fp),
     ]
+    if paf_file_fp:
+        cmd += ["-o", paf_file_fp]
     if output_no_hits:
         cmd.append("--paf-no-hit")
     return cmd
@@ -84,38 +111,37 @@ def minimap2_search(
     min_per_identity: float = None,
     output_no_hits: bool = True,
 ) -> pd.DataFrame:
-    # Ensure that only one of reference or index is provided
-    if reference and index:
-        raise ValueError(
-            "Only one of reference or index can be provided as input. "
-            "Choose one and try again."
-        )
-
-    # Ensure that at least one of reference and index is provided
-    if not reference and not index:
-        raise ValueError("Either reference or index must be provided as input.")
-
-    # Determine the reference or index path based on input
-    idx_ref_path = str(index.path / "index.mmi") if index else str(reference.path)
+    # Validate the inputs and determine the reference or index path
+    idx_ref_path = resolve_index_or_reference(index, reference)
 
-    # Create a reference to a file with PAF format
-    paf_file_fp = PairwiseAlignmentMN2Format()
-
-    # Construct the command
+    # Construct the command, with the PAF output on stdout
     cmd = construct_command(
         idx_ref_path,
-        query,
+        str(query),
         n_threads,
         preset,
-        paf_file_fp,
+        None,
         output_no_hits,
     )
 
-    # Execute the Minimap2 alignment command
-    run_cmd(cmd, "Minimap2")
-
-    # Read the PAF file as a pandas DataFrame
-    df = pd.read_csv(str(paf_file_fp), sep="\t", header=None)
+    print(EXTERNAL_CMD_WARNING)
+    print("\nCommand:", end=" ")
+    print(" ".join(cmd), end="\n\n")
+
+    # Stream the Minimap2 PAF output straight into the pandas parser, so
+    # the alignment and the parse overlap and no intermediate PAF file is
+    # ever written
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    try:
+        df = pd.read_csv(proc.stdout, sep="\t", header=None)
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise Exception(
+                "An error was encountered while using Minimap2, "
+                f"(return code {proc.returncode}), please inspect "
+                "stdout and stderr to learn more."
+            )
 
     # Filter the PAF file by maxaccepts (default = 1)
     df = filter_by_maxaccepts(df, maxaccepts)
@@ -5,48 +5,79 @@
 #
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
+import functools
 import os
 import subprocess
-import tempfile
-from distutils.dir_util import copy_tree
 
-import pkg_resources
-import q2templates
 from q2_types.per_sample_sequences import CasavaOneEightSingleLanePerSampleDirFmt
 
-from q2_pinocchio._utils import run_command
-
 
 # Run NanoPlot on sequence files in the specified directory
 def _run_nanoplot(sequences_path, nanoplot_output):
-    fastq_files = [
-        os.path.join(sequences_path, f)
-        for f in os.listdir(sequences_path)
-        if f.endswith(".fastq.gz")
+    # Collect the FASTQ files in a single scandir pass; the cached dirent
+    # type lets non-files be skipped without extra stat calls
+    with os.scandir(sequences_path) as entries:
+        fastq_files = [
+            entry.path
+            for entry in entries
+            if entry.is_file() and entry.name.endswith(".fastq.gz")
+        ]
+    # Let NanoPlot spread the gzip decoding and stats across all available
+    # cores instead of its single-threaded default
+    n_threads = os.cpu_count() or 1
+    nanoplot_cmd = [
+        "NanoPlot",
+        "--fastq",
+        *fastq_files,
+        "-t",
+        str(n_threads),
+        "-o",
+        nanoplot_output,
     ]
-    nanoplot_cmd = ["NanoPlot", "--fastq", *fastq_files, "-o", nanoplot_output]
     try:
-        # Run Nanoplot command
-        run_command(nanoplot_cmd, verbose=True)
+        # Run the Nanoplot command quietly; its progress chatter is only
+        # of interest when the run fails
+        subprocess.run(
+            nanoplot_cmd,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
     except subprocess.CalledProcessError as e:
-        raise Exception(
+        msg = (
             "An error was encountered while running nanoplot, "
             f"(return code {e.returncode}), please inspect "
             "stdout and stderr to learn more."
         )
+        if e.output:
+            msg += "\n\nNanoPlot output:\n" + e.output.decode()
+        raise Exception(msg)
+
 
+# Resolving the template path makes pkg_resources walk the installed
+# distributions; memoize it so batch pipelines producing many
+# visualizations pay that cost once per process
+@functools.lru_cache(maxsize=None)
+def _template_dir():
+    # pkg_resources is heavy to import, so defer it to rendering time
+    # so plugin load does not pay for it
+    import pkg_resources
 
-def _create_visualization(output_dir, nanoplot_output):
-    # Copy Nanoplot templates to the output directory
-    TEMPLATES = pkg_resources.resource_filename("q2_pinocchio", "assets")
-    copy_tree(os.path.join(TEMPLATES, "nanoplot"), output_dir)
+    return os.path.join(
+        pkg_resources.resource_filename("q2_pinocchio", "assets"), "nanoplot"
+    )
 
-    # Copy Nanoplot data from the temporary directory to the output directory
-    copy_tree(nanoplot_output, os.path.join(output_dir, "nanoplot_data"))
 
-    # Generate an index.html file for Nanoplot in the output directory
+def _create_visualization(output_dir):
+    # q2templates is heavy to import; defer it to rendering time so
+    # plugin load does not pay for it
+    import q2templates
+
+    # Generate an index.html file for Nanoplot in the output directory.
+    # render() writes the rendered template there itself, so no static
+    # copy of the assets tree is needed beforehand
     context = {"tabs": [{"title": "Nanoplot", "url": "index.html"}]}
-    index = os.path.join(TEMPLATES, "nanoplot", "index.html")
+    index = os.path.join(_template_dir(), "index.html")
     q2templates.render([index], output_dir, context=context)
 
 
@@ -54,6 +85,11 @@ def stats(
     output_dir: str,
     sequences: CasavaOneEightSingleLanePerSampleDirFmt,
 ):
-    with tempfile.TemporaryDirectory() as nanoplot_output:
-        _run_nanoplot(sequences.path, nanoplot_output)
-        _create_visualization(output_dir, nanoplot_output)
+    # Write the NanoPlot report straight into the visualization's data
+    # directory, instead of staging it in a temporary directory and
+    # copying every output byte a second time
+    nanoplot_data_dir = os.path.join(output_dir, "nanoplot_data")
+    os.makedirs(nanoplot_data_dir, exist_ok=True)
+
+    _run_nanoplot(sequences.path, nanoplot_data_dir)
+    _create_visualization(output_dir)
@@ -0,0 +1,96 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2024, Bokulich Lab.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import gzip
+import itertools
+import os
+import re
+
+# Expected read IDs for the shared SARS-CoV-2 query fixture, used by both
+# the extract_reads and filter_reads tests; defined once here instead of
+# being re-declared per module
+SEQ_IDS_MAPPED = frozenset(
+    [
+        "SARS2:6:73:941:1973#",
+        "SARS2:6:73:231:3321#",
+        "SARS2:6:73:233:3421#",
+        "SARS2:6:73:552:2457#",
+        "SARS2:6:73:567:7631#",
+    ]
+)
+SEQ_IDS_UNMAPPED = frozenset(["SARS2:6:73:356:9806#"])
+
+PERC_ID_MAPPED = frozenset(
+    [
+        "SARS2:6:73:231:3321#",
+        "SARS2:6:73:233:3421#",
+        "SARS2:6:73:552:2457#",
+        "SARS2:6:73:567:7631#",
+    ]
+)
+PERC_ID_UNMAPPED = frozenset(["SARS2:6:73:941:1973#", "SARS2:6:73:356:9806#"])
+
+# Extract the read ID from a FASTA/FASTQ header, trimming any trailing
+# "/", "0", "1" or "2" characters exactly like the original per-record
+# strip(">/012\n") did, so "#0/1", "#0" and bare "#" headers all reduce
+# to the same ID; precompiled once instead of a per-record char-set strip
+_FASTA_ID_RE = re.compile(r"^>(.*?)[/012]*\s*$")
+_FASTQ_ID_RE = re.compile(r"^@(.*?)[/012]*\s*$")
+
+
+# Compare observed IDs against the expected sets with C-level set
+# arithmetic, keeping the offending IDs in the failure messages
+def _assert_id_sets(testcase, seen, included_ids, excluded_ids):
+    # No stray IDs may appear...
+    testcase.assertLessEqual(seen, included_ids)
+    testcase.assertTrue(
+        seen.isdisjoint(excluded_ids), f"unexpected IDs: {seen & excluded_ids}"
+    )
+    # ...and every expected ID must actually appear, which also
+    # guarantees non-emptiness
+    testcase.assertGreaterEqual(seen, included_ids)
+
+
+# Assert that every record in a FASTA output belongs to included_ids and
+# never to excluded_ids
+def check_fasta_ids(testcase, extracted_sequences, included_ids, excluded_ids):
+    obs_fp = str(extracted_sequences)
+
+    # A stat call is enough to ensure something was extracted; no need
+    # to slurp the whole file into memory just to count its lines
+    testcase.assertGreater(os.path.getsize(obs_fp), 0)
+
+    # The output is FASTA, so collect the IDs from the header lines in
+    # one pass and compare whole sets, instead of dispatching two
+    # assertions per record
+    with open(obs_fp, "rt") as obs_fh:
+        seen = {
+            _FASTA_ID_RE.match(line).group(1) for line in obs_fh if line.startswith(">")
+        }
+    _assert_id_sets(testcase, seen, included_ids, excluded_ids)
+
+
+# Assert the same invariant over every .fastq.gz file in a per-sample
+# output directory
+def check_fastq_ids(testcase, obs_seqs, included_ids, excluded_ids):
+    # A single scandir pass yields the full paths directly, with no
+    # per-entry os.path.join
+    with os.scandir(str(obs_seqs)) as entries:
+        fastq_files = [e.path for e in entries if e.name.endswith(".fastq.gz")]
+
+    # Process each FASTQ.GZ file
+    for file_path in fastq_files:
+        with gzip.open(file_path, "rt") as obs_fh:
+            # Only the headers matter here, and FASTQ records are four
+            # lines each, so stride over every fourth line instead of
+            # materializing full records
+            seen = {
+                _FASTQ_ID_RE.match(obs_seq_h).group(1)
+                for obs_seq_h in itertools.islice(obs_fh, 0, None, 4)
+            }
+        _assert_id_sets(testcase, seen, included_ids, excluded_ids)
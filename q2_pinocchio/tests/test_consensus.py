@@ -7,8 +7,13 @@
 # ----------------------------------------------------------------------------
 
 
+import os
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import pandas.testing as pdt
+from pkg_resources import resource_filename
 from q2_types.feature_data import FeatureData, Sequence, Taxonomy
 from qiime2 import Artifact
 
@@ -19,20 +24,35 @@ from .test_pinocchio import PinocchioTestsBase
 
 def series_is_subset(expected, observed):
     joined = pd.concat([expected, observed], axis=1, join="inner")
-    compared = joined.apply(lambda x: x[0].startswith(x[1]), axis=1)
-    return len(compared[compared]) >= len(compared[~compared])
+    # Compare the two aligned columns in one vectorized pass instead of
+    # a per-row apply(axis=1) lambda
+    compared = np.frompyfunc(str.startswith, 2, 1)(
+        joined.iloc[:, 0].to_numpy(), joined.iloc[:, 1].to_numpy()
+    ).astype(bool)
+    return compared.sum() >= (~compared).sum()
 
 
-class TestConsensusAssignment(PinocchioTestsBase):
-    def setUp(self):
-        super().setUp()
+# The test inputs are read-only, so parse and import each of them at
+# most once per test session
+@lru_cache(maxsize=None)
+def _load_taxonomy(path):
+    return Artifact.import_data(FeatureData[Taxonomy], path)
+
 
-        taxonomy_tsv_path = self.get_data_path("consensus/taxonomy.tsv")
-        reads_path = self.get_data_path("consensus/se-dna-sequences.fasta")
+@lru_cache(maxsize=None)
+def _load_reads(path):
+    return Artifact.import_data(FeatureData[Sequence], path)
 
-        self.taxonomy = Artifact.import_data(FeatureData[Taxonomy], taxonomy_tsv_path)
-        self.reads = Artifact.import_data(FeatureData[Sequence], reads_path)
-        self.paf = Artifact.load(self.get_data_path("consensus/search_results.qza"))
+
+class TestConsensusAssignment(PinocchioTestsBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        data_dir = resource_filename(cls.package, "data/consensus")
+        cls.taxonomy = _load_taxonomy(os.path.join(data_dir, "taxonomy.tsv"))
+        cls.reads = _load_reads(os.path.join(data_dir, "se-dna-sequences.fasta"))
+        cls.paf = Artifact.load(os.path.join(data_dir, "search_results.qza"))
 
     def test_classify_consensus_minimap2(self):
         (paf, taxonomy) = self.plugin.pipelines["classify_consensus_minimap2"](
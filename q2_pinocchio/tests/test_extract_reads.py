@@ -6,70 +6,58 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
-import itertools
+import filecmp
+import os
 import unittest
 
+from pkg_resources import resource_filename
 from q2_types.feature_data import DNAFASTAFormat
 
 from q2_pinocchio.extract_reads import extract_reads
 from q2_pinocchio.types._format import Minimap2IndexDBDirFmt
 
+from ._fixtures import (
+    PERC_ID_MAPPED,
+    PERC_ID_UNMAPPED,
+    SEQ_IDS_MAPPED,
+    SEQ_IDS_UNMAPPED,
+    check_fasta_ids,
+)
 from .test_pinocchio import PinocchioTestsBase
 
-seq_ids_mapped = [
-    "SARS2:6:73:941:1973#",
-    "SARS2:6:73:231:3321#",
-    "SARS2:6:73:233:3421#",
-    "SARS2:6:73:552:2457#",
-    "SARS2:6:73:567:7631#",
-]
-seq_ids_unmapped = ["SARS2:6:73:356:9806#"]
-
-perc_id_mapped = [
-    "SARS2:6:73:231:3321#",
-    "SARS2:6:73:233:3421#",
-    "SARS2:6:73:552:2457#",
-    "SARS2:6:73:567:7631#",
-]
-
-perc_id_unmapped = ["SARS2:6:73:941:1973#", "SARS2:6:73:356:9806#"]
-
 
 class TestExtractreads(PinocchioTestsBase):
-    def setUp(self):
-        super().setUp()
-        self.query1_reads = DNAFASTAFormat(
-            self.get_data_path("extract_reads/extract_reads_test_input.fasta"), mode="r"
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The inputs are opened read-only, so build the formats once per
+        # class instead of re-opening them for every test method
+        data_dir = resource_filename(cls.package, "data/extract_reads")
+        cls.query1_reads = DNAFASTAFormat(
+            os.path.join(data_dir, "extract_reads_test_input.fasta"), mode="r"
         )
-        self.query2_reads = DNAFASTAFormat(
-            self.get_data_path("extract_reads/query-reads.fasta"), mode="r"
+        cls.query2_reads = DNAFASTAFormat(
+            os.path.join(data_dir, "query-reads.fasta"), mode="r"
         )
-        self.minimap2_index = Minimap2IndexDBDirFmt(
-            self.get_data_path("extract_reads/index/"), mode="r"
+        cls.minimap2_index = Minimap2IndexDBDirFmt(
+            os.path.join(data_dir, "index/"), mode="r"
         )
-        self.ref = DNAFASTAFormat(
-            self.get_data_path("extract_reads/se-dna-sequences.fasta"), mode="r"
+        cls.ref = DNAFASTAFormat(
+            os.path.join(data_dir, "se-dna-sequences.fasta"), mode="r"
         )
 
     def _check_extracted_ids(self, extracted_sequences, included_ids, excluded_ids):
-        with open(str(extracted_sequences), "rt") as obs_fh:
-            self.assertNotEqual(len(obs_fh.readlines()), 0)
-            obs_fh.seek(0)
-            for records in itertools.zip_longest(*[obs_fh] * 4):
-                (obs_seq_h, obs_seq, _, obs_qual) = records
-                obs_id = obs_seq_h.strip(">/012\n")
-                self.assertTrue(obs_id in included_ids)
-                self.assertTrue(obs_id not in excluded_ids)
+        check_fasta_ids(self, extracted_sequences, included_ids, excluded_ids)
 
     def test_extract_unmapped(self):
         extracted_sequences = extract_reads(
             self.query1_reads, self.minimap2_index, extract="unmapped"
         )
-        self._check_extracted_ids(extracted_sequences, seq_ids_unmapped, seq_ids_mapped)
+        self._check_extracted_ids(extracted_sequences, SEQ_IDS_UNMAPPED, SEQ_IDS_MAPPED)
 
     def test_extract_mapped(self):
         extracted_sequences = extract_reads(self.query1_reads, self.minimap2_index)
-        self._check_extracted_ids(extracted_sequences, seq_ids_mapped, seq_ids_unmapped)
+        self._check_extracted_ids(extracted_sequences, SEQ_IDS_MAPPED, SEQ_IDS_UNMAPPED)
 
     def test_extract_unmapped_with_perc_id(self):
         extracted_sequences = extract_reads(
@@ -78,7 +66,7 @@ class TestExtractreads(PinocchioTestsBase):
             extract="unmapped",
             min_per_identity=0.99,
         )
-        self._check_extracted_ids(extracted_sequences, perc_id_unmapped, perc_id_mapped)
+        self._check_extracted_ids(extracted_sequences, PERC_ID_UNMAPPED, PERC_ID_MAPPED)
 
     def test_extract_mapped_with_perc_id(self):
         extracted_sequences = extract_reads(
@@ -87,16 +75,14 @@ class TestExtractreads(PinocchioTestsBase):
             extract="mapped",
             min_per_identity=0.99,
         )
-        self._check_extracted_ids(extracted_sequences, perc_id_mapped, perc_id_unmapped)
+        self._check_extracted_ids(extracted_sequences, PERC_ID_MAPPED, PERC_ID_UNMAPPED)
 
     def test_extract_mapped_using_reference(self):
         extracted_sequences = extract_reads(self.query2_reads, reference=self.ref)
         obs_fp = str(extracted_sequences)
         correct_output_fp = self.get_data_path("extract_reads/extracted_mapped.fasta")
-        with open(correct_output_fp, "r") as file1, open(obs_fp, "r") as file2:
-            true_fasta_content = file1.read()
-            output_fasta_content = file2.read()
-            self.assertEqual(true_fasta_content, output_fasta_content)
+        # Block-level byte comparison, without reading both files into strings
+        self.assertTrue(filecmp.cmp(correct_output_fp, obs_fp, shallow=False))
 
     def test_extract_reads_both_ref_and_index(self):
         with self.assertRaisesRegex(ValueError, "Only one.*can be provided.*"):
@@ -233,118 +233,34 @@ class TestProcessSamFile(PinocchioTestsBase):
         self.only_primary = self.get_data_path("filtering_utils/mapped.sam")
         self.only_unmapped = self.get_data_path("filtering_utils/unmapped.sam")
 
-    def test_keep_primary_mapped(self):
-        # Create a temporary directory
+    def _process_and_compare(self, keep, min_per_identity, expected_fp):
+        # process_sam_file rewrites its input in place, so each case runs
+        # on its own scratch copy of the pristine fixture
         with tempfile.TemporaryDirectory() as tmpdir:
-            # Concatenate the temporary directory path and the original file name
             tmpfile = os.path.join(tmpdir, "initial_tmp.sam")
-
-            # Copy the SAM file to the temporary location
             shutil.copy(self.samfile, tmpfile)
 
-            process_sam_file(tmpfile, "mapped", None)
+            process_sam_file(tmpfile, keep, min_per_identity)
 
-            # Check each line for equality using splitlines()
+            # Compare the files line by line, skipping '@PG' header lines;
+            # zipping the two file objects streams both in constant memory
+            # instead of materializing each file as a list of lines
             with open(tmpfile, "r") as tmpfile_content, open(
-                self.only_primary, "r"
-            ) as primary_content:
-                tmp_lines = tmpfile_content.read().splitlines()
-                primary_lines = primary_content.read().splitlines()
-
-                tmp_index = 0
-                primary_index = 0
-
-                while tmp_index < len(tmp_lines) and primary_index < len(primary_lines):
-                    tmp_line = tmp_lines[tmp_index]
-                    primary_line = primary_lines[primary_index]
-
+                expected_fp, "r"
+            ) as expected_content:
+                for tmp_line, expected_line in zip(tmpfile_content, expected_content):
                     if tmp_line.startswith("@PG"):
-                        # Skip the line starting with '@PG' in tmp_lines
-                        tmp_index += 1
-                        primary_index += 1
                         continue
+                    self.assertEqual(tmp_line, expected_line)
 
-                    # Explicitly print the line
-                    self.assertEqual(tmp_line, primary_line)
-
-                    tmp_index += 1
-                    primary_index += 1
+    def test_keep_primary_mapped(self):
+        self._process_and_compare("mapped", None, self.only_primary)
 
     def test_keep_primary_mapped_with_perc_id(self):
-        # Create a temporary directory
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Concatenate the temporary directory path and the original file name
-            tmpfile = os.path.join(tmpdir, "initial_tmp.sam")
-
-            # Copy the SAM file to the temporary location
-            shutil.copy(self.samfile, tmpfile)
-
-            process_sam_file(tmpfile, "mapped", 0.3)
-
-            # Check each line for equality using splitlines()
-            with open(tmpfile, "r") as tmpfile_content, open(
-                self.only_primary, "r"
-            ) as primary_content:
-                tmp_lines = tmpfile_content.read().splitlines()
-                primary_lines = primary_content.read().splitlines()
-
-                tmp_index = 0
-                primary_index = 0
-
-                while tmp_index < len(tmp_lines) and primary_index < len(primary_lines):
-                    tmp_line = tmp_lines[tmp_index]
-                    primary_line = primary_lines[primary_index]
-
-                    if tmp_line.startswith("@PG"):
-                        # Skip the line starting with '@PG' in tmp_lines
-                        tmp_index += 1
-                        primary_index += 1
-                        continue
-
-                    # Explicitly print the line
-                    self.assertEqual(tmp_line, primary_line)
-
-                    tmp_index += 1
-                    primary_index += 1
+        self._process_and_compare("mapped", 0.3, self.only_primary)
 
     def test_keep_unmapped(self):
-        # Create a temporary directory
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Concatenate the temporary directory path and the original file name
-            tmpfile = os.path.join(tmpdir, "initial_tmp.sam")
-
-            # Copy the SAM file to the temporary location
-            shutil.copy(self.samfile, tmpfile)
-
-            process_sam_file(tmpfile, "unmapped", None)
-
-            # Check each line for equality using splitlines()
-            with open(tmpfile, "r") as tmpfile_content, open(
-                self.only_unmapped, "r"
-            ) as unmapped_content:
-                tmp_lines = tmpfile_content.read().splitlines()
-                unmapped_lines = unmapped_content.read().splitlines()
-
-                tmp_index = 0
-                unmapped_index = 0
-
-                while tmp_index < len(tmp_lines) and unmapped_index < len(
-                    unmapped_lines
-                ):
-                    tmp_line = tmp_lines[tmp_index]
-                    unmapped_line = unmapped_lines[unmapped_index]
-
-                    if tmp_line.startswith("@PG"):
-                        # Skip the line starting with '@PG' in tmp_lines
-                        tmp_index += 1
-                        unmapped_index += 1
-                        continue
-
-                    # Explicitly print the line
-                    self.assertEqual(tmp_line, unmapped_line)
-
-                    tmp_index += 1
-                    unmapped_index += 1
+        self._process_and_compare("unmapped", None, self.only_unmapped)
 
 
 class TestConvertToFasta(PinocchioTestsBase):
@@ -436,6 +352,31 @@ class TestMakeMn2Cmd(PinocchioTestsBase):
         )
         self.assertEqual(actual_cmd, expected_cmd)
 
+    def test_make_mn2_cmd_mapped_mode(self):
+        # In mapped mode Minimap2 should drop unmapped records itself
+        actual_cmd = make_mn2_cmd(
+            "map-preset", "/path/to/index", 4, [], "input.fastq", None, None, "mapped"
+        )
+        expected_cmd = [
+            "minimap2",
+            "-a",
+            "--sam-hit-only",
+            "-x",
+            "map-preset",
+            "/path/to/index",
+            "-t",
+            "4",
+            "input.fastq",
+        ]
+        self.assertEqual(actual_cmd, expected_cmd)
+
+    def test_make_mn2_cmd_unmapped_mode(self):
+        # Unmapped mode must keep the unmapped records in the output
+        actual_cmd = make_mn2_cmd(
+            "map-preset", "/path/to/index", 4, [], "input.fastq", None, None, "unmapped"
+        )
+        self.assertNotIn("--sam-hit-only", actual_cmd)
+
 
 class TestConvertToFastqPaired(PinocchioTestsBase):
     def test_convert_to_fastq_paired(self):
@@ -537,14 +478,32 @@ class TestRunCmd(PinocchioTestsBase):
 
 
 class TestCollateSamInplace(PinocchioTestsBase):
+    def setUp(self):
+        # Create a temporary SAM file for testing
+        self.temp_dir = tempfile.mkdtemp()
+        self.sam_file = os.path.join(self.temp_dir, "test_input.sam")
+
+    def tearDown(self):
+        # Remove the temporary directory and file
+        shutil.rmtree(self.temp_dir)
+
+    def write_sam_file(self, record_qnames):
+        content = "@HD\tVN:1.0\tSO:unsorted\n" + "".join(
+            f"{qname}\t0\tchr1\t100\t255\t50M\t*\t0\t0\t*\t*\n"
+            for qname in record_qnames
+        )
+        with open(self.sam_file, "w") as f:
+            f.write(content)
+
     @patch("q2_pinocchio._filtering_utils.run_cmd")
     @patch("shutil.move")
     def test_collate_sam_inplace(self, mock_shutil_move, mock_run_cmd):
-        input_sam_path = "test_input.sam"
-        temp_prefix = os.path.splitext(input_sam_path)[0] + "_temp_collate"
-        output_sam_path = os.path.splitext(input_sam_path)[0] + "_collated.sam"
+        # Interleaved pairs require an actual collation run
+        self.write_sam_file(["read1", "read2", "read1", "read2"])
+        temp_prefix = os.path.splitext(self.sam_file)[0] + "_temp_collate"
+        output_sam_path = os.path.splitext(self.sam_file)[0] + "_collated.sam"
 
-        collate_sam_inplace(input_sam_path)
+        collate_sam_inplace(self.sam_file)
 
         # Verify run_cmd was called with the correct command
         expected_cmd = [
@@ -555,12 +514,21 @@ class TestCollateSamInplace(PinocchioTestsBase):
             output_sam_path,
             "-T",
             temp_prefix,
-            input_sam_path,
+            self.sam_file,
         ]
         mock_run_cmd.assert_called_once_with(expected_cmd, "Samtools collate")
 
         # Verify shutil.move was called with the correct arguments
-        mock_shutil_move.assert_called_once_with(output_sam_path, input_sam_path)
+        mock_shutil_move.assert_called_once_with(output_sam_path, self.sam_file)
+
+    @patch("q2_pinocchio._filtering_utils.run_cmd")
+    def test_collate_sam_inplace_already_grouped(self, mock_run_cmd):
+        # Adjacent pairs make collation redundant, so samtools must not run
+        self.write_sam_file(["read1", "read1", "read2", "read2"])
+
+        collate_sam_inplace(self.sam_file)
+
+        mock_run_cmd.assert_not_called()
 
 
 class TestProcessPairedSamFlags(PinocchioTestsBase):
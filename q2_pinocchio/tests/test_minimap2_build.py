@@ -8,6 +8,7 @@
 import subprocess
 from unittest.mock import MagicMock, patch
 
+from pkg_resources import resource_filename
 from q2_types.feature_data import DNAFASTAFormat
 
 from q2_pinocchio.build_index import build_index, create_idx_build_cmd
@@ -16,32 +17,24 @@ from .test_pinocchio import PinocchioTestsBase
 
 
 class TestMinimap2Build(PinocchioTestsBase):
-    def setUp(self):
-        super().setUp()
-        # Retrieve the file path for the test DNA sequences
-        self.genome = DNAFASTAFormat(
-            self.get_data_path("minimap2_build/dna-sequences.fasta"), mode="r"
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The test DNA sequences are only ever read, so the format wrapper
+        # is built once for the whole class instead of per test method
+        cls.genome = DNAFASTAFormat(
+            resource_filename(cls.package, "data/minimap2_build/dna-sequences.fasta"),
+            mode="r",
         )
 
-    @patch("subprocess.run")
-    def test_build(self, mocked_run_command):
-        build_index(self.genome)
-        mocked_run_command.assert_called_once()
-
-    @patch("subprocess.run")
-    def test_build_hifi_preset(self, mocked_run_command):
-        build_index(self.genome, preset="map-hifi")
-        mocked_run_command.assert_called_once()
-
-    @patch("subprocess.run")
-    def test_build_map_pb_preset(self, mocked_run_command):
-        build_index(self.genome, preset="map-pb")
-        mocked_run_command.assert_called_once()
-
-    @patch("subprocess.run")
-    def test_build_sr_preset(self, mocked_run_command):
-        build_index(self.genome, preset="sr")
-        mocked_run_command.assert_called_once()
+    def test_build_presets(self):
+        # One parametrized test covers every supported preset instead of
+        # four copies of the same method body
+        for preset in ("map-ont", "map-hifi", "map-pb", "sr"):
+            with self.subTest(preset=preset):
+                with patch("subprocess.run") as mocked_run_command:
+                    build_index(self.genome, preset=preset)
+                    mocked_run_command.assert_called_once()
 
     @patch("subprocess.run")
     def test_build_index_subprocess_failure(self, mocked_run_command):
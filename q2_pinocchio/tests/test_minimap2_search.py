@@ -6,10 +6,12 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import os
 import unittest
 
 import pandas as pd
 from pandas.testing import assert_frame_equal
+from pkg_resources import resource_filename
 from q2_types.per_sample_sequences import CasavaOneEightSingleLanePerSampleDirFmt
 
 from q2_pinocchio.minimap2_search import (
@@ -23,20 +25,24 @@ from .test_pinocchio import PinocchioTestsBase
 
 
 class TestFilterByMaxAccepts(PinocchioTestsBase):
-    def setUp(self):
-        super().setUp()
-        # Retrieve the paths to test data files
-        self.initial_PairwiseAlignmentMN2_file = self.get_data_path(
-            "minimap2_search/initial_paf_file.paf"
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The initial PAF is shared by every test, so it is parsed once
+        # per class; the filters never mutate their input, so a shallow
+        # copy per test is enough to keep the frames independent
+        data_dir = resource_filename(cls.package, "data/minimap2_search")
+        cls.initial_df = pd.read_csv(
+            os.path.join(data_dir, "initial_paf_file.paf"), sep="\t", header=None
         )
-        self.exp_PairwiseAlignmentMN2_f_max1 = self.get_data_path(
-            "minimap2_search/expected_paf_file_max1.paf"
+        cls.exp_PairwiseAlignmentMN2_f_max1 = os.path.join(
+            data_dir, "expected_paf_file_max1.paf"
         )
-        self.exp_PairwiseAlignmentMN2_f_max2 = self.get_data_path(
-            "minimap2_search/expected_paf_file_max2.paf"
+        cls.exp_PairwiseAlignmentMN2_f_max2 = os.path.join(
+            data_dir, "expected_paf_file_max2.paf"
         )
-        self.exp_PairwiseAlignmentMN2_f_max3 = self.get_data_path(
-            "minimap2_search/expected_paf_file_max3.paf"
+        cls.exp_PairwiseAlignmentMN2_f_max3 = os.path.join(
+            data_dir, "expected_paf_file_max3.paf"
         )
 
     def test_filter_by_maxaccepts_max1(self):
@@ -50,9 +56,7 @@ class TestFilterByMaxAccepts(PinocchioTestsBase):
 
     def _test_filter_by_maxaccepts(self, max_accepts, expected_file_path):
         # Load input and expected data
-        input_df = pd.read_csv(
-            self.initial_PairwiseAlignmentMN2_file, sep="\t", header=None
-        )
+        input_df = self.initial_df.copy(deep=False)
         expected_df = pd.read_csv(expected_file_path, sep="\t", header=None)
 
         # Generate results from function
@@ -64,16 +68,18 @@ class TestFilterByMaxAccepts(PinocchioTestsBase):
 
 
 class TestFilterByPercIdentity(PinocchioTestsBase):
-    def setUp(self):
-        super().setUp()
-        self.PairwiseAlignmentMN2_file = self.get_data_path(
-            "minimap2_search/initial_paf_file.paf"
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        data_dir = resource_filename(cls.package, "data/minimap2_search")
+        cls.initial_df = pd.read_csv(
+            os.path.join(data_dir, "initial_paf_file.paf"), sep="\t", header=None
         )
-        self.expected_PairwiseAlignmentMN2_file_perc_85 = self.get_data_path(
-            "minimap2_search/expected_paf_file_perc_85.paf"
+        cls.expected_PairwiseAlignmentMN2_file_perc_85 = os.path.join(
+            data_dir, "expected_paf_file_perc_85.paf"
         )
-        self.expected_PairwiseAlignmentMN2_file_perc_80 = self.get_data_path(
-            "minimap2_search/expected_paf_file_perc_80.paf"
+        cls.expected_PairwiseAlignmentMN2_file_perc_80 = os.path.join(
+            data_dir, "expected_paf_file_perc_80.paf"
         )
 
     def test_filter_by_perc_identity_85(self):
@@ -88,7 +94,7 @@ class TestFilterByPercIdentity(PinocchioTestsBase):
 
     def _test_filter_by_perc_identity(self, perc_identity, expected_file_path):
         # Load input and expected data
-        input_df = pd.read_csv(self.PairwiseAlignmentMN2_file, sep="\t", header=None)
+        input_df = self.initial_df.copy(deep=False)
         expected_df = pd.read_csv(expected_file_path, sep="\t", header=None)
 
         # Generate results from function
@@ -100,17 +106,20 @@ class TestFilterByPercIdentity(PinocchioTestsBase):
 
 
 class TestMinimap2(PinocchioTestsBase):
-    def setUp(self):
-        super().setUp()
-
-        self.query_reads = CasavaOneEightSingleLanePerSampleDirFmt(
-            self.get_data_path("minimap2_search/query_seqs.fasta"), mode="r"
-        )
-        self.index_database = Minimap2IndexDBDirFmt(
-            self.get_data_path("minimap2_search/minimap2_test_index/"), mode="r"
-        )
-        self.ref = CasavaOneEightSingleLanePerSampleDirFmt(
-            self.get_data_path("minimap2_search/se-dna-sequences.fasta"), mode="r"
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # All three fixtures are opened read-only, so they are constructed
+        # once per class instead of before every test method
+        data_dir = resource_filename(cls.package, "data/minimap2_search")
+        cls.query_reads = CasavaOneEightSingleLanePerSampleDirFmt(
+            os.path.join(data_dir, "query_seqs.fasta"), mode="r"
+        )
+        cls.index_database = Minimap2IndexDBDirFmt(
+            os.path.join(data_dir, "minimap2_test_index/"), mode="r"
+        )
+        cls.ref = CasavaOneEightSingleLanePerSampleDirFmt(
+            os.path.join(data_dir, "se-dna-sequences.fasta"), mode="r"
         )
 
     def test_minimap2(self):
@@ -12,6 +12,7 @@ import tempfile
 import unittest
 from unittest.mock import patch
 
+from pkg_resources import resource_filename
 from q2_types.per_sample_sequences import CasavaOneEightSingleLanePerSampleDirFmt
 
 from q2_pinocchio.nanoplot_stats import _create_visualization, _run_nanoplot, stats
@@ -19,69 +20,76 @@ from q2_pinocchio.tests.test_pinocchio import PinocchioTestsBase
 
 
 class TestRunNanoPlot(PinocchioTestsBase):
-    @patch("q2_pinocchio.nanoplot_stats.run_command")
-    def test_run_nanoplot_success(self, mock_run_command):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The expected FASTQ list is a pure function of the fixture
+        # directory, so the directory is scanned once for the class
+        # instead of inside every test
+        cls.sequences_path = resource_filename(cls.package, "data/nanoplot/")
+        cls.fastq_files = [
+            os.path.join(cls.sequences_path, f)
+            for f in os.listdir(cls.sequences_path)
+            if f.endswith(".fastq.gz")
+        ]
+
+    @patch("q2_pinocchio.nanoplot_stats.subprocess.run")
+    def test_run_nanoplot_success(self, mock_run):
         """Test that _run_nanoplot runs successfully."""
-        sequences_path = self.get_data_path("nanoplot/")
         with tempfile.TemporaryDirectory() as output_dir:
 
-            # Mock run_command to simulate successful execution
-            mock_run_command.return_value = None  # Simulate no exception raised
+            # Mock subprocess.run to simulate successful execution
+            mock_run.return_value = None  # Simulate no exception raised
 
             # Call the function
-            _run_nanoplot(sequences_path, output_dir)
-
-            # Check that run_command was called correctly
-            fastq_files = [
-                os.path.join(sequences_path, f)
-                for f in os.listdir(sequences_path)
-                if f.endswith(".fastq.gz")
+            _run_nanoplot(self.sequences_path, output_dir)
+
+            # Check that NanoPlot was invoked quietly with captured output
+            nanoplot_cmd = [
+                "NanoPlot",
+                "--fastq",
+                *self.fastq_files,
+                "-t",
+                str(os.cpu_count() or 1),
+                "-o",
+                output_dir,
             ]
-            nanoplot_cmd = ["NanoPlot", "--fastq", *fastq_files, "-o", output_dir]
-            mock_run_command.assert_called_once_with(nanoplot_cmd, verbose=True)
+            mock_run.assert_called_once_with(
+                nanoplot_cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
 
-    @patch("q2_pinocchio.nanoplot_stats.run_command")
-    def test_run_nanoplot_exception(self, mock_run_command):
+    @patch("q2_pinocchio.nanoplot_stats.subprocess.run")
+    def test_run_nanoplot_exception(self, mock_run):
         """Test that _run_nanoplot raises an exception when NanoPlot fails."""
-        sequences_path = self.get_data_path("nanoplot/")
         with tempfile.TemporaryDirectory() as output_dir:
-            # Mock run_command to raise CalledProcessError
-            mock_run_command.side_effect = subprocess.CalledProcessError(
-                returncode=1, cmd="NanoPlot"
+            # Mock subprocess.run to raise CalledProcessError
+            mock_run.side_effect = subprocess.CalledProcessError(
+                returncode=1, cmd="NanoPlot", output=b"no reads found"
             )
             with self.assertRaises(Exception) as context:
-                _run_nanoplot(sequences_path, output_dir)
+                _run_nanoplot(self.sequences_path, output_dir)
             self.assertIn(
                 "An error was encountered while running nanoplot",
                 str(context.exception),
             )
+            self.assertIn("no reads found", str(context.exception))
 
 
 class TestCreateVisualization(PinocchioTestsBase):
-    @patch("q2_pinocchio.nanoplot_stats.q2templates.render")
-    @patch("q2_pinocchio.nanoplot_stats.copy_tree")
-    @patch("q2_pinocchio.nanoplot_stats.pkg_resources.resource_filename")
-    def test_create_visualization(
-        self, mock_resource_filename, mock_copy_tree, mock_render
-    ):
-        """Test that copies templates and data, and renders the index.html."""
+    @patch("q2templates.render")
+    @patch("q2_pinocchio.nanoplot_stats._template_dir")
+    def test_create_visualization(self, mock_template_dir, mock_render):
+        """Test that renders the index.html from the memoized template dir."""
         output_dir = "/fake/output/dir"
-        nanoplot_output = "/fake/nanoplot/output"
 
-        # Mock the resource filename to return a fake templates directory
-        mock_resource_filename.return_value = "/fake/templates/dir"
+        # Mock the memoized helper to return a fake templates directory
+        mock_template_dir.return_value = "/fake/templates/dir/nanoplot"
 
         # Call the function
-        _create_visualization(output_dir, nanoplot_output)
-
-        # Check that resource_filename was called correctly
-        mock_resource_filename.assert_called_once_with("q2_pinocchio", "assets")
-
-        # Check that copy_tree was called correctly for templates and nanoplot data
-        mock_copy_tree.assert_any_call("/fake/templates/dir/nanoplot", output_dir)
-        mock_copy_tree.assert_any_call(
-            nanoplot_output, os.path.join(output_dir, "nanoplot_data")
-        )
+        _create_visualization(output_dir)
 
         # Check that q2templates.render was called correctly
         expected_context = {"tabs": [{"title": "Nanoplot", "url": "index.html"}]}
@@ -90,6 +98,15 @@ class TestCreateVisualization(PinocchioTestsBase):
             [expected_index], output_dir, context=expected_context
         )
 
+    def test_template_dir_is_memoized(self):
+        """Test that the template path is resolved once per process."""
+        from q2_pinocchio.nanoplot_stats import _template_dir
+
+        _template_dir.cache_clear()
+        first = _template_dir()
+        self.assertEqual(_template_dir(), first)
+        self.assertEqual(_template_dir.cache_info().hits, 1)
+
 
 class TestStats(PinocchioTestsBase):
     @patch("q2_pinocchio.nanoplot_stats._create_visualization")
@@ -97,20 +114,22 @@ class TestStats(PinocchioTestsBase):
     def test_stats(self, mock_run_nanoplot, mock_create_visualization):
         """Test the stats function."""
         # Create the necessary objects
-        output_dir = "/fake/output/dir"
         sequences = CasavaOneEightSingleLanePerSampleDirFmt()
         sequences.path = "/fake/sequences/path"  # Set a fake path attribute
 
-        # Call the stats function
-        stats(output_dir, sequences)
-
-        # Check that _run_nanoplot was called with the correct first argument
-        args, _ = mock_run_nanoplot.call_args
-        self.assertEqual(args[0], sequences.path)
-
-        # Check that _create_visualization was called with the correct first argument
-        args, _ = mock_create_visualization.call_args
-        self.assertEqual(args[0], output_dir)
+        with tempfile.TemporaryDirectory() as output_dir:
+            # Call the stats function
+            stats(output_dir, sequences)
+
+            # Check that _run_nanoplot writes directly into the data directory
+            args, _ = mock_run_nanoplot.call_args
+            self.assertEqual(args[0], sequences.path)
+            self.assertEqual(args[1], os.path.join(output_dir, "nanoplot_data"))
+            self.assertTrue(os.path.isdir(os.path.join(output_dir, "nanoplot_data")))
+
+            # Check that _create_visualization was called with the output directory
+            args, _ = mock_create_visualization.call_args
+            self.assertEqual(args[0], output_dir)
 
 
 if __name__ == "__main__":